@@ -1,20 +1,72 @@
+import io
+import multiprocessing
 import os
-import uuid
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, UTC
+from functools import lru_cache
 
-# use a non-interactive backend for headless environments
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np
 
+import orjson
 from flask import Flask, jsonify, request, send_file
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# pysimdjson is optional; without it request bodies are parsed by orjson
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - depends on environment
+    simdjson = None
 
 # directory for storing generated plot images
 PLOTS_DIR = os.environ.get("PLOT_SERVICE_DIR", "plots")
 
-# simple in-memory index of generated plots
-# maps plot_id -> { "path": <file_path>, "created_at": <iso8601> }
-PLOTS = {}
+# where png bytes are kept: "disk" writes them under PLOTS_DIR,
+# "memory" keeps them in the plot index and skips the filesystem
+PLOT_STORAGE = os.environ.get("PLOT_SERVICE_STORAGE", "disk")
+if PLOT_STORAGE not in ("disk", "memory"):
+    raise ValueError(
+        f"PLOT_SERVICE_STORAGE must be 'disk' or 'memory', got {PLOT_STORAGE!r}"
+    )
+
+# maximum number of plots kept before the least recently used is evicted
+# clamped to 1 so a freshly created plot is never evicted immediately
+PLOT_CAPACITY = max(1, int(os.environ.get("PLOT_CAPACITY", "1024")))
+
+# one index entry; path is None with memory storage, data is None on disk
+PlotEntry = namedtuple("PlotEntry", ["path", "data", "created_at"])
+
+# simple in-memory lru index of generated plots
+# maps plot_id -> PlotEntry, least recently used first
+PLOTS = OrderedDict()
+_plots_lock = threading.Lock()
+
+# series longer than this are downsampled to DOWNSAMPLE_POINTS before
+# plotting; the 720px wide image cannot show more detail than that
+DOWNSAMPLE_THRESHOLD = 1500
+DOWNSAMPLE_POINTS = 1000
+
+# number of worker processes rendering plots; 0 renders in the
+# request thread instead
+PLOT_WORKERS = int(os.environ.get("PLOT_WORKERS", str(os.cpu_count() or 1)))
+
+# maximum number of plots accepted by one POST /plots:batch request
+MAX_BATCH_PLOTS = int(os.environ.get("MAX_BATCH_PLOTS", "100"))
+
+# process pool for rendering, created on first use, see _get_executor
+_executor = None
+_executor_lock = threading.Lock()
+
+# per-thread state reused across requests: the figure (see _get_figure),
+# the png buffer (see _get_png_buffer) and the simdjson parser
+_tls = threading.local()
+
+# (epoch_second, iso8601) of the last formatted timestamp, see _created_at
+_ts_cache = (0, "")
 
 
 def _ensure_plots_dir() -> None:
@@ -24,10 +76,29 @@ def _ensure_plots_dir() -> None:
     os.makedirs(PLOTS_DIR, exist_ok=True)
 
 
-_ensure_plots_dir()
+class OrjsonProvider(JSONProvider):
+    """
+    json provider backed by orjson for request parsing and jsonify
+    orjson keeps keys in insertion order, matching JSON_SORT_KEYS = False
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# let a fronting server (apache mod_xsendfile, lighttpd) send plot files;
+# without it send_file still uses wsgi.file_wrapper where available
+app.config["USE_X_SENDFILE"] = bool(int(os.environ.get("USE_X_SENDFILE", "0")))
 app.config["JSON_SORT_KEYS"] = False  # keep response keys in defined order
+# reject oversized bodies before they are read and parsed as json
+app.config["MAX_CONTENT_LENGTH"] = int(
+    os.environ.get("MAX_BODY_BYTES", str(512 * 1024))
+)
 
 
 # -----------------------------
@@ -35,6 +106,35 @@ app.config["JSON_SORT_KEYS"] = False  # keep response keys in defined order
 # -----------------------------
 
 
+def _parse_json_body():
+    """
+    parses the request body as json, preferring simdjson when installed
+    returns None when the body is not valid json, like get_json(silent=True)
+    """
+    if simdjson is None:
+        return request.get_json(silent=True)
+
+    # simdjson parsers are not thread safe, keep one per thread
+    parser = getattr(_tls, "json_parser", None)
+    if parser is None:
+        parser = _tls.json_parser = simdjson.Parser()
+    try:
+        # recursive=True materializes plain dicts/lists, so nothing
+        # refers back into the parser's buffer once it is reused
+        return parser.parse(request.get_data(), recursive=True)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _normalize_meta(title, x_label, y_label):
+    """
+    returns interned (title, x_label, y_label) so clients that repeat
+    the same labels share one set of strings across requests
+    """
+    return sys.intern(title), sys.intern(x_label), sys.intern(y_label)
+
+
 def _validate_plot_request(payload):
     """
     validates incoming plot generation payload
@@ -66,61 +166,390 @@ def _validate_plot_request(payload):
         return None, None, "data contains too many points (max 5000)"
 
     try:
-        y_values = [float(v) for v in y]
+        y_values = np.asarray(y, dtype=np.float64)
     except (TypeError, ValueError):
         return None, None, "all y values must be numeric"
 
+    # nested arrays coerce to 2-d and null coerces to nan, reject both
+    if y_values.ndim != 1 or not np.isfinite(y_values).all():
+        return None, None, "all y values must be numeric"
+
     if x is None:
-        x_values = list(range(len(y_values)))
+        x_values = np.arange(y_values.size, dtype=np.float64)
     else:
         if not isinstance(x, (list, tuple)):
             return None, None, "'data.x' must be an array of numbers"
-        if len(x) != len(y_values):
+        if len(x) != y_values.size:
             return None, None, "x and y must have the same length"
         try:
-            x_values = [float(v) for v in x]
+            x_values = np.asarray(x, dtype=np.float64)
         except (TypeError, ValueError):
             return None, None, "all x values must be numeric"
+        if x_values.ndim != 1 or not np.isfinite(x_values).all():
+            return None, None, "all x values must be numeric"
 
+    title, x_label, y_label = _normalize_meta(
+        str(payload.get("title", "Data Plot")),
+        str(payload.get("x_label", "Index")),
+        str(payload.get("y_label", "Value")),
+    )
     meta = {
-        "title": str(payload.get("title", "Data Plot")),
-        "x_label": str(payload.get("x_label", "Index")),
-        "y_label": str(payload.get("y_label", "Value")),
+        "title": title,
+        "x_label": x_label,
+        "y_label": y_label,
+        # opt-in pillow renderer, see _render_fast_png
+        "fast": payload.get("fast") is True,
     }
 
     return x_values, y_values, meta
 
 
-def _generate_plot_file(x_values, y_values, meta):
+def _lttb(x, y, n_out):
+    """
+    largest-triangle-three-buckets downsampling of a line series
+    keeps the first and last points and, from each bucket in between,
+    the point forming the largest triangle with its neighbours
+    x must be sorted; returns (x_out, y_out) with n_out points
+    """
+    n = x.shape[0]
+    x_out = np.empty(n_out, dtype=np.float64)
+    y_out = np.empty(n_out, dtype=np.float64)
+    x_out[0] = x[0]
+    y_out[0] = y[0]
+
+    bucket = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+
+        # average of the next bucket is the third triangle vertex
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(end, next_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        count = next_end - end
+        if count > 0:
+            avg_x /= count
+            avg_y /= count
+        else:
+            avg_x = x[n - 1]
+            avg_y = y[n - 1]
+
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs(
+                (x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])
+            )
+            if area > best_area:
+                best_area = area
+                best = j
+
+        x_out[i + 1] = x[best]
+        y_out[i + 1] = y[best]
+        a = best
+
+    x_out[n_out - 1] = x[n - 1]
+    y_out[n_out - 1] = y[n - 1]
+    return x_out, y_out
+
+
+@lru_cache(maxsize=None)
+def _get_lttb_jit():
     """
-    generates a plot image and stores it on disk
-    returns (plot_id, file_path, created_at)
+    returns the numba-compiled _lttb, or None when numba is missing
+    numba is optional and slow to import, so it is loaded on first use;
+    the interpreted kernel costs more than it saves, so it is not used
     """
-    plot_id = str(uuid.uuid4())
-    file_name = f"{plot_id}.png"
-    file_path = os.path.join(PLOTS_DIR, file_name)
+    try:
+        from numba import njit
+    except ImportError:  # pragma: no cover - depends on environment
+        return None
+    return njit(cache=True)(_lttb)
 
-    # create a new figure for each plot
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.plot(x_values, y_values, linewidth=1.8)
 
-    ax.set_title(meta["title"])
-    ax.set_xlabel(meta["x_label"])
-    ax.set_ylabel(meta["y_label"])
-    ax.grid(True, linewidth=0.3, alpha=0.4)
+def _downsample(x_values, y_values):
+    """
+    reduces long, x-sorted series to DOWNSAMPLE_POINTS before plotting
+    returns the inputs unchanged when numba is unavailable or x is unsorted
+    """
+    if len(y_values) <= DOWNSAMPLE_THRESHOLD:
+        return x_values, y_values
+    lttb_jit = _get_lttb_jit()
+    if lttb_jit is None:
+        return x_values, y_values
+
+    x_arr = np.ascontiguousarray(x_values, dtype=np.float64)
+    y_arr = np.ascontiguousarray(y_values, dtype=np.float64)
+    if np.any(np.diff(x_arr) < 0):
+        return x_values, y_values
+    return lttb_jit(x_arr, y_arr, DOWNSAMPLE_POINTS)
+
+
+def _get_figure():
+    """
+    returns this thread's reusable (fig, ax, line)
+    figures are built without pyplot so they are not tracked globally
+    and are released with the thread; the single line artist is updated
+    in place rather than clearing the axes for every plot
+    """
+    fig = getattr(_tls, "fig", None)
+    if fig is None:
+        # matplotlib is imported on the first plot to keep startup fast;
+        # using Figure and the agg canvas directly needs no backend setup
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(6, 4))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.grid(True, linewidth=0.3, alpha=0.4)
+        (line,) = ax.plot([], [], linewidth=1.8)
+        _tls.fig = fig
+        _tls.ax = ax
+        _tls.line = line
+        _tls.last_meta = None
+    return fig, _tls.ax, _tls.line
+
+
+def _store_plot(plot_id, entry):
+    """
+    adds a plot to the index, evicting the least recently used plots
+    (and their files) once PLOT_CAPACITY is exceeded
+    """
+    evicted = []
+    with _plots_lock:
+        PLOTS[plot_id] = entry
+        PLOTS.move_to_end(plot_id)
+        while len(PLOTS) > PLOT_CAPACITY:
+            evicted.append(PLOTS.popitem(last=False)[1])
+
+    for old in evicted:
+        if old.path:
+            try:
+                os.unlink(old.path)
+            except OSError:
+                pass
+
+
+def _lookup_plot(plot_id):
+    """
+    returns the index entry for plot_id, marking it recently used
+    returns None when the plot is unknown or was evicted
+    """
+    with _plots_lock:
+        info = PLOTS.get(plot_id)
+        if info is not None:
+            PLOTS.move_to_end(plot_id)
+    return info
+
+
+def _created_at():
+    """
+    returns the current utc time as an iso8601 string at second resolution
+    the formatted string is reused for all plots created within one second
+    """
+    global _ts_cache
+    sec = int(time.time())
+    cached = _ts_cache
+    if cached[0] != sec:
+        cached = (sec, datetime.fromtimestamp(sec, UTC).isoformat())
+        _ts_cache = cached
+    return cached[1]
+
+
+def _get_png_buffer():
+    """
+    returns this thread's png output buffer, rewound for a new image
+    callers truncate after writing, dropping any longer previous image,
+    and copy the result out with getvalue() before the next reuse
+    """
+    buf = getattr(_tls, "buf", None)
+    if buf is None:
+        buf = _tls.buf = io.BytesIO()
+    buf.seek(0)
+    return buf
+
+
+def _render_png(x_values, y_values, meta):
+    """
+    renders a line plot and returns the encoded png bytes
+    """
+    # reuse this thread's figure instead of building one per plot
+    fig, ax, line = _get_figure()
+    x_values, y_values = _downsample(x_values, y_values)
+    line.set_data(x_values, y_values)
+    ax.relim()
+    ax.autoscale_view()
+
+    # text setters invalidate layout, so skip them when labels repeat
+    meta_tuple = (meta["title"], meta["x_label"], meta["y_label"])
+    if _tls.last_meta != meta_tuple:
+        ax.set_title(meta["title"])
+        ax.set_xlabel(meta["x_label"])
+        ax.set_ylabel(meta["y_label"])
+        _tls.last_meta = meta_tuple
 
     fig.tight_layout()
-    fig.savefig(file_path, dpi=120)
-    plt.close(fig)
+    # zlib level 1 deflates several times faster than the default of 6
+    # for slightly larger files, a good trade for short-lived plots
+    buf = _get_png_buffer()
+    fig.savefig(
+        buf,
+        format="png",
+        dpi=120,
+        pil_kwargs={"compress_level": 1, "optimize": False},
+    )
+    buf.truncate()
+    return buf.getvalue()
 
-    created_at = datetime.now(UTC).isoformat()
 
-    PLOTS[plot_id] = {
-        "path": file_path,
-        "created_at": created_at,
-    }
+def _scale(values, lo, hi, start, length):
+    """
+    maps data values in [lo, hi] onto pixel offsets start..start+length
+    """
+    if hi == lo:
+        return np.full(values.shape, start + length / 2.0)
+    return start + (values - lo) * (length / (hi - lo))
+
+
+def _render_fast_png(x_values, y_values, meta):
+    """
+    renders a simple line plot with pillow instead of matplotlib
+    same 720x480 canvas as the matplotlib path but with a fixed layout,
+    five ticks per axis and no text shaping, for clients that opt in
+    """
+    from PIL import Image, ImageDraw
+
+    width, height = 720, 480
+    left, right, top, bottom = 70, 20, 35, 50
+    plot_w = width - left - right
+    plot_h = height - top - bottom
+
+    x = np.asarray(x_values, dtype=np.float64)
+    y = np.asarray(y_values, dtype=np.float64)
+    x_lo, x_hi = float(x.min()), float(x.max())
+    y_lo, y_hi = float(y.min()), float(y.max())
+
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+
+    # grid lines and tick labels
+    for frac in np.linspace(0.0, 1.0, 5):
+        px = left + frac * plot_w
+        py = top + plot_h - frac * plot_h
+        draw.line([(px, top), (px, top + plot_h)], fill=(230, 230, 230))
+        draw.line([(left, py), (left + plot_w, py)], fill=(230, 230, 230))
+
+        x_tick = f"{x_lo + frac * (x_hi - x_lo):.4g}"
+        y_tick = f"{y_lo + frac * (y_hi - y_lo):.4g}"
+        draw.text((px, top + plot_h + 6), x_tick, fill="black", anchor="ma")
+        draw.text((left - 6, py), y_tick, fill="black", anchor="rm")
+
+    draw.rectangle([left, top, left + plot_w, top + plot_h], outline="black")
+
+    # y grows downwards in image coordinates
+    px = _scale(x, x_lo, x_hi, left, plot_w)
+    py = top + plot_h - _scale(y, y_lo, y_hi, 0, plot_h)
+    draw.line(list(zip(px.tolist(), py.tolist())), fill=(31, 119, 180), width=2)
+
+    draw.text((width / 2, top / 2), meta["title"], fill="black", anchor="mm")
+    draw.text(
+        (left + plot_w / 2, height - 12), meta["x_label"], fill="black", anchor="mm"
+    )
+    draw.text((8, top / 2), meta["y_label"], fill="black", anchor="lm")
+
+    buf = _get_png_buffer()
+    img.save(buf, format="PNG", compress_level=1)
+    buf.truncate()
+    return buf.getvalue()
 
-    return plot_id, file_path, created_at
+
+def _generate_plot_file(x_values, y_values, meta):
+    """
+    renders a plot to png bytes; runs in a worker process, so it must
+    not touch the plot index
+    returns (plot_id, png_bytes, created_at)
+    """
+    plot_id = os.urandom(16).hex()
+    if meta["fast"]:
+        data = _render_fast_png(x_values, y_values, meta)
+    else:
+        data = _render_png(x_values, y_values, meta)
+    return plot_id, data, _created_at()
+
+
+def _worker_init():
+    """
+    warms up matplotlib and this worker's figure before the first plot
+    """
+    _get_figure()
+
+
+def _get_executor():
+    """
+    returns the shared rendering pool, or None when PLOT_WORKERS is 0
+    workers are spawned rather than forked so they never inherit locks
+    held by other request threads
+    """
+    global _executor
+    if PLOT_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PLOT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+            )
+    return _executor
+
+
+def _render_plot(x_values, y_values, meta):
+    """
+    renders a plot in the process pool, or inline without one
+    returns (plot_id, png_bytes, created_at)
+    """
+    executor = _get_executor()
+    if executor is None:
+        return _generate_plot_file(x_values, y_values, meta)
+    return executor.submit(_generate_plot_file, x_values, y_values, meta).result()
+
+
+def _render_plots(items):
+    """
+    renders a list of (x_values, y_values, meta) across the process pool
+    returns [(plot_id, png_bytes, created_at), ...] in input order
+    """
+    executor = _get_executor()
+    if executor is None:
+        return [_generate_plot_file(*item) for item in items]
+    return list(executor.map(_generate_plot_file, *zip(*items)))
+
+
+def _save_plot(plot_id, data, created_at):
+    """
+    stores rendered png bytes on disk or in memory and indexes them
+    returns the file path, or None when PLOT_STORAGE is "memory"
+    """
+    if PLOT_STORAGE == "memory":
+        _store_plot(plot_id, PlotEntry(None, data, created_at))
+        return None
+
+    file_path = os.path.join(PLOTS_DIR, f"{plot_id}.png")
+    try:
+        f = open(file_path, "wb")
+    except FileNotFoundError:
+        # the directory is created lazily, on the first plot that needs it
+        _ensure_plots_dir()
+        f = open(file_path, "wb")
+    with f:
+        f.write(data)
+    _store_plot(plot_id, PlotEntry(file_path, None, created_at))
+    return file_path
 
 
 # -----------------------------
@@ -151,8 +580,12 @@ def create_plot():
       "data": [1, 2, 3] or { "x": [...], "y": [...] },
       "title": "optional title",
       "x_label": "optional label",
-      "y_label": "optional label"
+      "y_label": "optional label",
+      "fast": false
     }
+    "fast": true renders with pillow instead of matplotlib
+    responds with the png itself instead of json when the client sends
+    "Accept: image/png"
     """
     if not request.is_json:
         return (
@@ -165,7 +598,7 @@ def create_plot():
             400,
         )
 
-    payload = request.get_json(silent=True)
+    payload = _parse_json_body()
     x_values, y_values, meta_or_error = _validate_plot_request(payload)
 
     if x_values is None:
@@ -180,19 +613,102 @@ def create_plot():
             400,
         )
 
-    plot_id, file_path, created_at = _generate_plot_file(x_values, y_values, meta_or_error)
+    plot_id, data, created_at = _render_plot(x_values, y_values, meta_or_error)
+    file_path = _save_plot(plot_id, data, created_at)
 
-    return (
-        jsonify(
-            {
-                "status": "ok",
-                "plot_id": plot_id,
-                "created_at": created_at,
-                "image_path": file_path,
-            }
-        ),
-        200,
-    )
+    # clients that only accept png get the image straight back
+    best = request.accept_mimetypes.best_match(["application/json", "image/png"])
+    if best == "image/png":
+        resp = send_file(
+            io.BytesIO(data),
+            mimetype="image/png",
+            download_name=f"plot-{plot_id}.png",
+        )
+        resp.headers["X-Plot-Id"] = plot_id
+        return resp
+
+    body = {
+        "status": "ok",
+        "plot_id": plot_id,
+        "created_at": created_at,
+    }
+    # plots kept in memory have no file to point at
+    if file_path is not None:
+        body["image_path"] = file_path
+
+    return jsonify(body), 200
+
+
+@app.route("/plots:batch", methods=["POST"])
+def create_plots_batch():
+    """
+    generates several plots in one request
+    expected json body:
+    {
+      "plots": [ <POST /plots body>, ... ]
+    }
+    every item is validated before any plot is rendered; the response
+    lists plots in request order
+    """
+    if not request.is_json:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "expected json body",
+                }
+            ),
+            400,
+        )
+
+    payload = _parse_json_body()
+    plots = payload.get("plots") if isinstance(payload, dict) else None
+    if not isinstance(plots, list) or not plots:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "'plots' must be a non-empty array",
+                }
+            ),
+            400,
+        )
+
+    if len(plots) > MAX_BATCH_PLOTS:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": f"too many plots in batch (max {MAX_BATCH_PLOTS})",
+                }
+            ),
+            400,
+        )
+
+    items = []
+    for i, item in enumerate(plots):
+        x_values, y_values, meta_or_error = _validate_plot_request(item)
+        if x_values is None:
+            return (
+                jsonify(
+                    {
+                        "status": "error",
+                        "message": f"plots[{i}]: {meta_or_error}",
+                    }
+                ),
+                400,
+            )
+        items.append((x_values, y_values, meta_or_error))
+
+    results = []
+    for plot_id, data, created_at in _render_plots(items):
+        file_path = _save_plot(plot_id, data, created_at)
+        result = {"plot_id": plot_id, "created_at": created_at}
+        if file_path is not None:
+            result["image_path"] = file_path
+        results.append(result)
+
+    return jsonify({"status": "ok", "plots": results}), 200
 
 
 @app.route("/plots/<plot_id>", methods=["GET"])
@@ -200,8 +716,8 @@ def download_plot(plot_id):
     """
     returns the generated plot image file for download
     """
-    info = PLOTS.get(plot_id)
-    if not info:
+    info = _lookup_plot(plot_id)
+    if info is None:
         return (
             jsonify(
                 {
@@ -212,8 +728,24 @@ def download_plot(plot_id):
             404,
         )
 
-    file_path = info.get("path")
-    if not file_path or not os.path.exists(file_path):
+    if info.data is not None:
+        return send_file(
+            io.BytesIO(info.data),
+            mimetype="image/png",
+            as_attachment=True,
+            download_name=f"plot-{plot_id}.png",
+        )
+
+    # send the stored png file as an attachment; send_file stats the
+    # file itself, so a missing file surfaces here without a pre-check
+    try:
+        return send_file(
+            info.path,
+            mimetype="image/png",
+            as_attachment=True,
+            download_name=f"plot-{plot_id}.png",
+        )
+    except FileNotFoundError:
         return (
             jsonify(
                 {
@@ -224,12 +756,20 @@ def download_plot(plot_id):
             500,
         )
 
-    # send the stored png file as an attachment
-    return send_file(
-        file_path,
-        mimetype="image/png",
-        as_attachment=True,
-        download_name=f"plot-{plot_id}.png",
+
+@app.errorhandler(RequestEntityTooLarge)
+def too_large(_error):
+    """
+    json 413 handler for bodies over MAX_CONTENT_LENGTH
+    """
+    return (
+        jsonify(
+            {
+                "status": "error",
+                "message": "request body is too large",
+            }
+        ),
+        413,
     )
 
 
@@ -253,6 +793,8 @@ def create_app():
     """
     factory used by tests or wsgi servers
     """
+    if PLOT_STORAGE == "disk":
+        _ensure_plots_dir()
     return app
 
 
@@ -1,10 +1,14 @@
 import os
 import shutil
 import unittest
+from unittest import mock
+
+import numpy as np
 
 # configure plots directory before importing app
 os.environ["PLOT_SERVICE_DIR"] = "test_plots"
 
+import app as app_module  # noqa: E402
 from app import create_app, PLOTS, PLOTS_DIR  # noqa: E402
 
 
@@ -104,6 +108,37 @@ class DataPlotVisualizerTests(unittest.TestCase):
         self.assertTrue(os.path.exists(image_path))
         self.assertIn(plot_id, PLOTS)
 
+    def test_generate_fast_plot_writes_png(self):
+        payload = {"data": [3, 1, 4, 1, 5], "title": "Fast", "fast": True}
+        resp = self.client.post("/plots", json=payload)
+        self.assertEqual(resp.status_code, 200)
+
+        image_path = resp.get_json().get("image_path")
+        with open(image_path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"\x89PNG"))
+
+    def test_generate_plot_inline_without_workers(self):
+        with mock.patch.object(app_module, "PLOT_WORKERS", 0):
+            plot_id, body = self._generate_sample_plot()
+        self.assertTrue(os.path.exists(body.get("image_path")))
+        self.assertIn(plot_id, PLOTS)
+
+    def test_generate_plot_recreates_missing_plots_dir(self):
+        shutil.rmtree(PLOTS_DIR)
+
+        _, body = self._generate_sample_plot()
+        self.assertTrue(os.path.exists(body.get("image_path")))
+
+    def test_reused_png_buffer_drops_previous_image(self):
+        meta = {"title": "t", "x_label": "x", "y_label": "y", "fast": False}
+        y = np.sin(np.arange(500) / 7.0)
+        large = app_module._render_png(np.arange(500.0), y, meta)
+        small = app_module._render_png(np.arange(2.0), np.arange(2.0), meta)
+
+        # a stale tail from the larger image would carry a second IEND
+        self.assertLess(len(small), len(large))
+        self.assertEqual(small.count(b"IEND"), 1)
+
     def test_generate_plot_rejects_non_json_body(self):
         resp = self.client.post("/plots", data="not-json", content_type="text/plain")
         self.assertEqual(resp.status_code, 400)
@@ -112,6 +147,21 @@ class DataPlotVisualizerTests(unittest.TestCase):
         self.assertEqual(data.get("status"), "error")
         self.assertIn("expected json body", data.get("message", "").lower())
 
+    def test_generate_plot_rejects_malformed_json(self):
+        resp = self.client.post(
+            "/plots", data='{"data": [1, 2', content_type="application/json"
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "error")
+        self.assertIn("json object", data.get("message", "").lower())
+
+    def test_generate_plot_without_simdjson(self):
+        with mock.patch.object(app_module, "simdjson", None):
+            plot_id, _ = self._generate_sample_plot()
+        self.assertIn(plot_id, PLOTS)
+
     def test_generate_plot_rejects_missing_data_field(self):
         resp = self.client.post("/plots", json={"title": "no data"})
         self.assertEqual(resp.status_code, 400)
@@ -129,6 +179,26 @@ class DataPlotVisualizerTests(unittest.TestCase):
         self.assertEqual(data.get("status"), "error")
         self.assertIn("all y values must be numeric", data.get("message", "").lower())
 
+    def test_generate_plot_rejects_null_y_values(self):
+        payload = {"data": [1, None, 3]}
+        resp = self.client.post("/plots", json=payload)
+        self.assertEqual(resp.status_code, 400)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "error")
+        self.assertIn("all y values must be numeric", data.get("message", "").lower())
+
+    def test_generate_plot_rejects_non_finite_values(self):
+        for token in ("NaN", "Infinity", "-Infinity"):
+            body = '{"data": [1, %s, 3]}' % token
+            resp = self.client.post(
+                "/plots", data=body, content_type="application/json"
+            )
+            self.assertEqual(resp.status_code, 400, token)
+
+            data = resp.get_json()
+            self.assertEqual(data.get("status"), "error")
+
     def test_generate_plot_rejects_too_many_points(self):
         payload = {"data": list(range(5001))}
         resp = self.client.post("/plots", json=payload)
@@ -138,6 +208,16 @@ class DataPlotVisualizerTests(unittest.TestCase):
         self.assertEqual(data.get("status"), "error")
         self.assertIn("too many points", data.get("message", "").lower())
 
+    def test_generate_plot_rejects_oversized_body(self):
+        limit = self.app.config["MAX_CONTENT_LENGTH"]
+        body = '{"data": [%s]}' % ", ".join(["1"] * limit)
+        resp = self.client.post("/plots", data=body, content_type="application/json")
+        self.assertEqual(resp.status_code, 413)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "error")
+        self.assertIn("too large", data.get("message", "").lower())
+
     def test_generate_plot_rejects_mismatched_x_y_lengths(self):
         payload = {
             "data": {
@@ -152,6 +232,58 @@ class DataPlotVisualizerTests(unittest.TestCase):
         self.assertEqual(data.get("status"), "error")
         self.assertIn("same length", data.get("message", "").lower())
 
+    def test_lttb_keeps_endpoints_and_peak(self):
+        x = np.arange(5000, dtype=np.float64)
+        y = np.zeros(5000)
+        y[2345] = 10.0
+
+        x_ds, y_ds = app_module._lttb(x, y, 100)
+
+        self.assertEqual(len(x_ds), 100)
+        self.assertEqual((x_ds[0], x_ds[-1]), (0.0, 4999.0))
+        self.assertTrue(np.all(np.diff(x_ds) > 0))
+        self.assertIn(10.0, y_ds)
+
+    def test_generate_plot_with_max_points(self):
+        resp = self.client.post("/plots", json={"data": list(range(5000))})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(os.path.exists(resp.get_json().get("image_path")))
+
+    def test_generate_plots_batch(self):
+        payload = {
+            "plots": [
+                {"data": [1, 2, 3], "title": "First"},
+                {"data": {"x": [0, 2], "y": [5, 6]}, "fast": True},
+            ]
+        }
+        resp = self.client.post("/plots:batch", json=payload)
+        self.assertEqual(resp.status_code, 200)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "ok")
+        plots = data.get("plots")
+        self.assertEqual(len(plots), 2)
+        for plot in plots:
+            self.assertIn(plot.get("plot_id"), PLOTS)
+            self.assertTrue(os.path.exists(plot.get("image_path")))
+
+    def test_generate_plots_batch_reports_invalid_item(self):
+        payload = {"plots": [{"data": [1, 2]}, {"data": ["a", "b"]}]}
+        resp = self.client.post("/plots:batch", json=payload)
+        self.assertEqual(resp.status_code, 400)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "error")
+        self.assertIn("plots[1]", data.get("message", ""))
+        self.assertEqual(len(PLOTS), 0)
+
+    def test_generate_plots_batch_rejects_too_many_plots(self):
+        with mock.patch.object(app_module, "MAX_BATCH_PLOTS", 1):
+            payload = {"plots": [{"data": [1, 2]}, {"data": [3, 4]}]}
+            resp = self.client.post("/plots:batch", json=payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("too many plots", resp.get_json().get("message", ""))
+
     def test_download_existing_plot_returns_png(self):
         plot_id, body = self._generate_sample_plot()
         image_path = body.get("image_path")
@@ -167,6 +299,67 @@ class DataPlotVisualizerTests(unittest.TestCase):
         # close response to avoid unclosed file warnings
         resp.close()
 
+    def test_generate_plot_returns_png_when_requested(self):
+        resp = self.client.post(
+            "/plots",
+            json={"data": [1, 2, 3]},
+            headers={"Accept": "image/png"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content_type, "image/png")
+        self.assertTrue(resp.data.startswith(b"\x89PNG"))
+        self.assertIn(resp.headers.get("X-Plot-Id"), PLOTS)
+        resp.close()
+
+    def test_memory_storage_serves_plot_without_file(self):
+        with mock.patch.object(app_module, "PLOT_STORAGE", "memory"):
+            plot_id, body = self._generate_sample_plot()
+        self.assertNotIn("image_path", body)
+        self.assertEqual(os.listdir(PLOTS_DIR), [])
+
+        resp = self.client.get(f"/plots/{plot_id}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content_type, "image/png")
+        self.assertTrue(resp.data.startswith(b"\x89PNG"))
+        resp.close()
+
+    def test_least_recently_used_plot_is_evicted(self):
+        with mock.patch.object(app_module, "PLOT_CAPACITY", 2):
+            first_id, first = self._generate_sample_plot()
+            second_id, _ = self._generate_sample_plot()
+
+            # touch the first plot so the second becomes least recent
+            self.client.get(f"/plots/{first_id}").close()
+            third_id, _ = self._generate_sample_plot()
+
+        self.assertEqual(list(PLOTS), [first_id, third_id])
+        self.assertNotIn(second_id, PLOTS)
+        self.assertTrue(os.path.exists(first.get("image_path")))
+        self.assertEqual(len(os.listdir(PLOTS_DIR)), 2)
+
+    def test_download_plot_with_deleted_file_returns_500(self):
+        plot_id, body = self._generate_sample_plot()
+        os.remove(body.get("image_path"))
+
+        resp = self.client.get(f"/plots/{plot_id}")
+        self.assertEqual(resp.status_code, 500)
+
+        data = resp.get_json()
+        self.assertEqual(data.get("status"), "error")
+        self.assertIn("missing", data.get("message", "").lower())
+
+    def test_download_with_x_sendfile_sets_header(self):
+        plot_id, body = self._generate_sample_plot()
+
+        with mock.patch.dict(self.app.config, {"USE_X_SENDFILE": True}):
+            resp = self.client.get(f"/plots/{plot_id}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.headers.get("X-Sendfile"), os.path.abspath(body.get("image_path"))
+        )
+        self.assertEqual(resp.data, b"")
+        resp.close()
+
     def test_download_missing_plot_returns_404(self):
         resp = self.client.get("/plots/does-not-exist")
         self.assertEqual(resp.status_code, 404)